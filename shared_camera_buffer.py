@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Shared-Memory Camera Frame Ring Buffer
+"""
+
+import contextlib
+
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+
+# 헤더 레이아웃 (int64): [write_seq, slot_seq[0], ..., slot_seq[num_slots - 1]]
+_HEADER_ITEM = np.dtype(np.int64).itemsize
+
+
+class CameraFrameRing:
+    """고정 shape uint8 멀티카메라 프레임을 담는 shared-memory ring buffer
+
+    writer(환경) 프로세스가 create=True로 버퍼를 만들고, policy/logger 프로세스는
+    같은 name으로 attach 한다. 프레임은 shared memory 위의 numpy view로 바로
+    읽으므로 복사나 pickling이 없다.
+
+    각 슬롯에는 시퀀스 번호가 붙는다. 쓰는 동안은 슬롯 시퀀스를 0으로 두고,
+    다 쓴 뒤 새 번호를 기록한다 (seqlock). latest()는 슬롯 시퀀스가 write_seq와
+    일치할 때만 view를 돌려주고, reader는 view를 다 쓴 뒤 is_valid()로 그 사이에
+    덮어써지지 않았는지 다시 확인한다.
+
+    numpy의 일반 load/store는 프로세스 간 메모리 순서를 보장하지 않는다. lock 없이
+    동작하는 것은 store 순서가 유지되는 x86에서뿐이다. ARM(Jetson 등)에서는
+    multiprocessing Lock을 lock으로 넘겨야 한다. 헤더 갱신/조회를 lock으로 감싸므로
+    그 acquire/release가 프레임 데이터와 헤더 사이의 메모리 배리어 역할을 한다.
+    lock은 spec()에 포함되어 multiprocessing 자식 프로세스에만 전달할 수 있다.
+    """
+
+    def __init__(self, name, camera_names, height, width, num_slots=8, create=False,
+                 untrack=False, lock=None):
+        self.camera_names = list(camera_names)
+        self.height = height
+        self.width = width
+        self.num_slots = num_slots
+        self.frame_shape = (len(self.camera_names), height, width, 3)
+
+        header_size = (1 + num_slots) * _HEADER_ITEM
+        frames_size = num_slots * int(np.prod(self.frame_shape))
+
+        if create:
+            self.shm = shared_memory.SharedMemory(
+                name=name, create=True, size=header_size + frames_size
+            )
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            if untrack:
+                # writer와 무관한 프로세스(자체 resource_tracker 사용)에서 attach 한 경우 전용.
+                # 그 tracker가 종료 시 버퍼를 unlink 하지 않도록 등록 해제한다.
+                # multiprocessing 자식 프로세스는 부모의 tracker를 공유하므로 사용하면 안 된다
+                # (writer 비정상 종료 시 정리가 사라지고, owner의 unlink 때 KeyError 발생).
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.name = self.shm.name
+        self.owner = create
+        self.lock = lock
+        self._header_guard = lock if lock is not None else contextlib.nullcontext()
+
+        self._header = np.ndarray((1 + num_slots,), dtype=np.int64, buffer=self.shm.buf)
+        self._frames = np.ndarray(
+            (num_slots,) + self.frame_shape, dtype=np.uint8,
+            buffer=self.shm.buf, offset=header_size,
+        )
+        if create:
+            self._header[:] = 0
+
+    def spec(self):
+        """다른 프로세스에서 attach 할 때 필요한 인자"""
+        spec = {
+            "name": self.name,
+            "camera_names": self.camera_names,
+            "height": self.height,
+            "width": self.width,
+            "num_slots": self.num_slots,
+        }
+        if self.lock is not None:
+            spec["lock"] = self.lock
+        return spec
+
+    @classmethod
+    def attach(cls, spec, untrack=False):
+        """spec()으로 받은 정보로 기존 버퍼에 연결
+
+        untrack은 writer와 무관한 별도 프로세스에서 attach 할 때만 True로 준다.
+        """
+        return cls(create=False, untrack=untrack, **spec)
+
+    @property
+    def write_seq(self):
+        """마지막으로 완료된 프레임의 시퀀스 번호 (없으면 0)"""
+        with self._header_guard:
+            return int(self._header[0])
+
+    def write(self, obs):
+        """robosuite 관측(dict)의 '<camera>_image'들을 다음 슬롯에 기록"""
+        seq = self.write_seq + 1
+        slot = (seq - 1) % self.num_slots
+
+        # 쓰는 중임을 표시
+        with self._header_guard:
+            self._header[1 + slot] = 0
+        for i, camera_name in enumerate(self.camera_names):
+            self._frames[slot, i] = obs[f"{camera_name}_image"]
+        with self._header_guard:
+            self._header[1 + slot] = seq
+            self._header[0] = seq
+
+        return seq
+
+    def latest(self):
+        """가장 최근 프레임의 (seq, view) 반환. view는 (num_cameras, H, W, 3) 복사 없는 배열"""
+        with self._header_guard:
+            seq = int(self._header[0])
+            if seq == 0:
+                return 0, None
+            slot = (seq - 1) % self.num_slots
+            # 읽기 전 확인: 이미 다음 쓰기가 이 슬롯을 덮어쓰기 시작했으면 버린다
+            if int(self._header[1 + slot]) != seq:
+                return seq, None
+        return seq, self._frames[slot]
+
+    def get(self, seq):
+        """특정 시퀀스 번호의 프레임 view 반환. 이미 덮어써졌거나 쓰는 중이면 None"""
+        if not self.is_valid(seq):
+            return None
+        return self._frames[(seq - 1) % self.num_slots]
+
+    def is_valid(self, seq):
+        """seq 프레임이 아직 슬롯에 온전히 남아 있는지 확인"""
+        if seq <= 0:
+            return False
+        slot = (seq - 1) % self.num_slots
+        with self._header_guard:
+            return int(self._header[1 + slot]) == seq
+
+    def close(self):
+        """view를 해제하고 shared memory 연결 종료 (owner면 unlink)"""
+        self._header = None
+        self._frames = None
+        self.lock = None
+        self._header_guard = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
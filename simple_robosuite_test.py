@@ -6,12 +6,18 @@ Simple RoboSuite Test
 import numpy as np
 import sys
 import os
+import queue
+import time
 
 # RoboSuite 경로 추가
 robosuite_path = "/home/work/data/JBP/pooling/gr00t_robosuite/robosuite"
 if robosuite_path not in sys.path:
     sys.path.insert(0, robosuite_path)
 
+# 카메라 관측 테스트가 지원하는 CPU 소프트웨어 offscreen 렌더링 backend.
+# robosuite import 전에 사용자가 MUJOCO_GL=osmesa 또는 egl을 export 해야 한다.
+SOFTWARE_GL_BACKENDS = ("osmesa", "egl")
+
 def test_robosuite_import():
     """RoboSuite import 테스트"""
     try:
@@ -117,6 +123,295 @@ def test_simple_simulation_step(env):
         import traceback
         traceback.print_exc()
 
+def random_policy(env):
+    """action_spec 범위 내의 랜덤 정책"""
+    action_low, action_high = env.action_spec
+    return lambda obs: np.random.uniform(action_low, action_high)
+
+def run_control_loop(env, policy=None, control_freq=None, num_ticks=200):
+    """고정 주기(1/control_freq) 제어 루프 실행 및 타이밍 측정
+
+    monotonic clock 기준 절대 데드라인으로 스케줄링하므로 sleep 오차가 누적되지 않는다.
+    한 틱(policy + env.step)이 주기를 넘기면 deadline miss로 기록하고,
+    밀린 틱은 따라잡지 않고 다음 주기 경계로 건너뛴다.
+
+    env.step 한 번은 env.control_timestep 만큼 시뮬레이션을 진행하므로,
+    control_freq는 env의 control_freq와 같아야 한다 (기본값).
+    """
+    if control_freq is None:
+        control_freq = env.control_freq
+    elif control_freq != env.control_freq:
+        raise ValueError(
+            f"control_freq={control_freq} does not match env.control_freq={env.control_freq}"
+        )
+    if policy is None:
+        policy = random_policy(env)
+
+    period = 1.0 / control_freq
+    sim_time = num_ticks * env.control_timestep  # 루프 동안 진행되는 시뮬레이션 시간
+    latencies = []  # 틱 당 policy + step 소요 시간
+    jitters = []    # 예정 시작 시각 대비 실제 시작 시각 지연
+    deadline_misses = 0
+    skipped_ticks = 0
+
+    obs = env.reset()
+    start = time.monotonic()
+    next_tick = start
+
+    for _ in range(num_ticks):
+        # 다음 틱 시작 시각까지 대기
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        tick_start = time.monotonic()
+        jitters.append(tick_start - next_tick)
+
+        action = policy(obs)
+        obs, reward, done, info = env.step(action)
+        if done:
+            obs = env.reset()
+
+        tick_end = time.monotonic()
+        latencies.append(tick_end - tick_start)
+
+        next_tick += period
+        if tick_end > next_tick:
+            deadline_misses += 1
+            # 밀린 주기는 건너뛰고 다음 경계에 정렬
+            missed = int((tick_end - next_tick) // period) + 1
+            skipped_ticks += missed
+            next_tick += missed * period
+
+    wall_time = time.monotonic() - start
+    latencies_ms = np.array(latencies) * 1000.0
+    jitters_ms = np.array(jitters) * 1000.0
+
+    return {
+        "control_freq": control_freq,
+        "num_ticks": num_ticks,
+        "period_ms": period * 1000.0,
+        "latency_p50_ms": float(np.percentile(latencies_ms, 50)),
+        "latency_p90_ms": float(np.percentile(latencies_ms, 90)),
+        "latency_p99_ms": float(np.percentile(latencies_ms, 99)),
+        "latency_max_ms": float(latencies_ms.max()),
+        "jitter_mean_ms": float(jitters_ms.mean()),
+        "jitter_std_ms": float(jitters_ms.std()),
+        "jitter_max_ms": float(jitters_ms.max()),
+        "deadline_misses": deadline_misses,
+        "skipped_ticks": skipped_ticks,
+        # 실시간 대비 시뮬레이션 진행 속도 (1.0 이상이면 실시간 유지)
+        "real_time_factor": sim_time / wall_time,
+        # 주기를 전혀 고려하지 않았을 때 낼 수 있는 최대 속도
+        "max_real_time_factor": sim_time / float(np.sum(latencies)),
+    }
+
+def test_realtime_control_loop(env, env_type, policy=None, control_freq=None, num_ticks=200):
+    """실시간 제어 루프 테스트 (주어진 policy+env가 control_freq를 유지하는지 확인)"""
+    if env is None:
+        return None
+
+    try:
+        if control_freq is None:
+            control_freq = env.control_freq
+        print(f"🔄 Running {control_freq} Hz control loop for {num_ticks} ticks ({env_type})...")
+        stats = run_control_loop(env, policy=policy, control_freq=control_freq, num_ticks=num_ticks)
+
+        print(f"📊 Latency p50/p90/p99/max: "
+              f"{stats['latency_p50_ms']:.2f} / {stats['latency_p90_ms']:.2f} / "
+              f"{stats['latency_p99_ms']:.2f} / {stats['latency_max_ms']:.2f} ms "
+              f"(period {stats['period_ms']:.2f} ms)")
+        print(f"📊 Jitter mean/std/max: "
+              f"{stats['jitter_mean_ms']:.2f} / {stats['jitter_std_ms']:.2f} / "
+              f"{stats['jitter_max_ms']:.2f} ms")
+        print(f"📊 Deadline misses: {stats['deadline_misses']}/{num_ticks} "
+              f"(skipped ticks: {stats['skipped_ticks']})")
+        print(f"📊 Real-time factor: {stats['real_time_factor']:.2f}x "
+              f"(max achievable: {stats['max_real_time_factor']:.2f}x)")
+
+        if stats['deadline_misses'] == 0:
+            print(f"✅ {env_type} sustains {control_freq} Hz!")
+        else:
+            print(f"⚠️ {env_type} cannot sustain {control_freq} Hz")
+
+        return stats
+
+    except Exception as e:
+        print(f"❌ Real-time control loop failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+def _camera_reader_process(ring_spec, num_frames, result_queue):
+    """shared memory에서 프레임을 복사 없이 읽는 policy/logger 쪽 프로세스"""
+    from shared_camera_buffer import CameraFrameRing
+
+    try:
+        ring = CameraFrameRing.attach(ring_spec)
+    except Exception as e:
+        result_queue.put({"error": f"attach failed: {e!r}"})
+        return
+
+    last_seq = 0
+    read_frames = 0
+    dropped_frames = 0
+    torn_frames = 0
+    deadline = time.monotonic() + 30.0
+
+    try:
+        while read_frames < num_frames and time.monotonic() < deadline:
+            seq, frames = ring.latest()
+            if seq == last_seq or frames is None:
+                time.sleep(0.0005)
+                continue
+
+            # view를 바로 사용 (복사 없음)
+            mean_intensity = float(frames.mean())
+
+            # 사용하는 동안 writer가 덮어썼는지 확인
+            if not ring.is_valid(seq):
+                torn_frames += 1
+                continue
+
+            if last_seq:
+                dropped_frames += seq - last_seq - 1
+            last_seq = seq
+            read_frames += 1
+
+        result_queue.put({
+            "read_frames": read_frames,
+            "dropped_frames": dropped_frames,
+            "torn_frames": torn_frames,
+            "last_seq": last_seq,
+            "last_mean_intensity": mean_intensity if read_frames else 0.0,
+        })
+    except Exception as e:
+        # writer 쪽에서 원인을 알 수 있도록 예외를 큐로 전달
+        result_queue.put({"error": repr(e)})
+    finally:
+        frames = None
+        ring.close()
+
+def test_camera_observation_transport(camera_names=("agentview", "robot0_eye_in_hand"),
+                                      camera_size=84, num_frames=50, control_freq=20, timeout=60.0):
+    """offscreen 카메라 관측을 shared-memory ring buffer로 다른 프로세스에 전달하는 테스트"""
+    import multiprocessing as mp
+    from shared_camera_buffer import CameraFrameRing
+
+    if os.environ.get("MUJOCO_GL") not in SOFTWARE_GL_BACKENDS:
+        print(f"⏭️ Skipping camera observation transport: "
+              f"export MUJOCO_GL=osmesa or MUJOCO_GL=egl before running "
+              f"(current: {os.environ.get('MUJOCO_GL')})")
+        return None
+
+    env = None
+    ring = None
+    reader = None
+
+    try:
+        from robosuite.environments.manipulation.pick_place import PickPlace
+
+        env_config = {
+            "robots": "Panda",
+            "has_renderer": False,
+            "has_offscreen_renderer": True,  # offscreen (CPU) 렌더링
+            "use_camera_obs": True,
+            "camera_names": list(camera_names),
+            "camera_heights": camera_size,
+            "camera_widths": camera_size,
+            "control_freq": control_freq,
+        }
+
+        print(f"🔄 Creating PickPlace environment with cameras {list(camera_names)} "
+              f"({os.environ.get('MUJOCO_GL')})...")
+        env = PickPlace(**env_config)
+        obs = env.reset()
+
+        # reader는 spawn 자식 프로세스. lock은 ARM에서도 헤더/프레임 순서를 보장하기 위함
+        ctx = mp.get_context("spawn")
+        ring = CameraFrameRing(
+            name=f"gr00t_cam_{os.getpid()}",
+            camera_names=camera_names,
+            height=camera_size,
+            width=camera_size,
+            create=True,
+            lock=ctx.Lock(),
+        )
+        ring.write(obs)
+        print(f"✅ Shared-memory ring created: {ring.name} "
+              f"(slots={ring.num_slots}, frame={ring.frame_shape})")
+
+        result_queue = ctx.Queue()
+        reader = ctx.Process(
+            target=_camera_reader_process,
+            args=(ring.spec(), num_frames, result_queue),
+        )
+        reader.start()
+
+        action_low, action_high = env.action_spec
+        period = 1.0 / control_freq
+        next_tick = time.monotonic()
+        render_times = []
+        deadline = time.monotonic() + timeout
+
+        while reader.is_alive():
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"camera reader did not finish within {timeout:.0f} s")
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            next_tick += period
+
+            tick_start = time.monotonic()
+            obs, reward, done, info = env.step(np.random.uniform(action_low, action_high))
+            if done:
+                obs = env.reset()
+            ring.write(obs)
+            render_times.append(time.monotonic() - tick_start)
+
+        # 큐 데이터를 먼저 꺼내야 자식 프로세스가 종료될 수 있다 (get 후 join)
+        try:
+            result = result_queue.get(timeout=5.0)
+        except queue.Empty:
+            reader.join(timeout=5.0)
+            raise RuntimeError(
+                f"camera reader exited without a result (exitcode={reader.exitcode})"
+            ) from None
+        reader.join()
+
+        if "error" in result:
+            raise RuntimeError(f"camera reader failed: {result['error']}")
+
+        step_mean = f"{np.mean(render_times) * 1000.0:.2f} ms" if render_times else "n/a"
+        print(f"📊 Published frames: {ring.write_seq}, step+render mean: {step_mean}")
+        print(f"📊 Reader frames: {result['read_frames']}/{num_frames}, "
+              f"dropped: {result['dropped_frames']}, "
+              f"torn: {result['torn_frames']}, last seq: {result['last_seq']}")
+
+        if result['read_frames'] != num_frames or result['torn_frames'] != 0:
+            print("⚠️ Camera observation transport incomplete "
+                  "(reader timed out or saw torn frames)")
+            return None
+
+        print("✅ Camera observation transport successful!")
+
+        return result
+
+    except Exception as e:
+        print(f"❌ Camera observation transport failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+    finally:
+        if reader is not None and reader.is_alive():
+            reader.terminate()
+            reader.join()
+        if ring is not None:
+            ring.close()
+        if env is not None:
+            env.close()
+
 def main():
     print("🤖 RoboSuite Integration Test")
     print("=" * 50)
@@ -130,21 +425,37 @@ def main():
     # Step 2: 단일 팔 환경 테스트
     print("\n2️⃣ Testing Single-Arm Environment...")
     single_env = test_environment_creation()
+    single_rt = None
     
     if single_env:
         test_simple_simulation_step(single_env)
+        single_rt = test_realtime_control_loop(single_env, "Single-Arm")
     
     # Step 3: 이중 팔 환경 테스트
     print("\n3️⃣ Testing Dual-Arm Environment...")
     dual_env = test_dual_arm_environment()
+    dual_rt = None
     
     if dual_env:
         test_simple_simulation_step(dual_env)
+        dual_rt = test_realtime_control_loop(dual_env, "Dual-Arm")
     
+    # Step 4: 카메라 관측 shared-memory 전달 테스트
+    print("\n4️⃣ Testing Camera Observation Transport...")
+    camera_skipped = os.environ.get("MUJOCO_GL") not in SOFTWARE_GL_BACKENDS
+    camera_result = test_camera_observation_transport()
+
     print("\n📊 Test Summary:")
     print(f"✅ RoboSuite Import: {'Success' if 'robosuite' in sys.modules else 'Failed'}")
     print(f"✅ Single-Arm Env: {'Success' if single_env else 'Failed'}")
     print(f"✅ Dual-Arm Env: {'Success' if dual_env else 'Failed'}")
+    print(f"✅ Camera Transport: "
+          f"{'Skipped' if camera_skipped else 'Success' if camera_result else 'Failed'}")
+    for env_type, rt in (("Single-Arm", single_rt), ("Dual-Arm", dual_rt)):
+        if rt is not None:
+            print(f"⏱️ {env_type} RTF: {rt['real_time_factor']:.2f}x, "
+                  f"p99 latency: {rt['latency_p99_ms']:.2f} ms, "
+                  f"deadline misses: {rt['deadline_misses']}/{rt['num_ticks']}")
     
     if dual_env or single_env:
         print("\n🎉 RoboSuite integration successful!")